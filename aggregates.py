@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Window choices offered on the stats and leaderboard commands (None = all-time)
+WINDOWS = {"7": 7, "14": 14, "30": 30, "90": 90, "all": None}
+DEFAULT_WINDOW = "14"
+
+WORDLE_COLUMNS = {
+    "played": lambda e: 1,
+    "wins": lambda e: 0 if e["failed"] else 1,
+    "guesses": lambda e: 0 if e["failed"] else e["guesses"],
+    **{f"g{i}": (lambda e, i=i: 1 if not e["failed"] and e["guesses"] == i else 0) for i in range(1, 7)},
+    "fails": lambda e: 1 if e["failed"] else 0,
+}
+
+CONNECTIONS_COLUMNS = {
+    "played": lambda e: 1,
+    "wins": lambda e: 1 if e["mistakes"] <= 3 else 0,
+    "score": lambda e: e["score"],
+    "perfects": lambda e: 1 if e["score"] >= 95 else 0,
+    "purple_first": lambda e: 1 if e.get("purple_first", False) else 0,
+    "reverse_rainbows": lambda e: 1 if e["score"] == 99 else 0,
+    **{f"m{i}": (lambda e, i=i: 1 if e["mistakes"] == i else 0) for i in range(5)},
+}
+
+GAME_COLUMNS = {"wordle": WORDLE_COLUMNS, "connections": CONNECTIONS_COLUMNS}
+
+
+def window_label(window):
+    """Human-readable name for a window choice, e.g. for embed titles."""
+    if window == DEFAULT_WINDOW:
+        return "Current"
+    if WINDOWS[window] is None:
+        return "All-Time"
+    return f"Last {window}"
+
+
+def window_phrase(window):
+    """Window choice as a phrase for messages, e.g. "in the last 7 puzzles"."""
+    if WINDOWS[window] is None:
+        return "across all puzzles"
+    return f"in the last {window} puzzles"
+
+
+class PrefixAggregate:
+    """Cumulative sums over a user's results for one game, in puzzle order.
+
+    Only puzzles the user played are stored: ``numbers`` holds their sorted puzzle
+    numbers and ``prefix`` one row of running totals per column, so the total over
+    any puzzle range is a binary search and one subtraction.
+    """
+
+    def __init__(self, entries, columns):
+        keys = sorted(entries, key=int)
+        self.columns = list(columns)
+        self.numbers = np.array([int(k) for k in keys], dtype=np.int32)
+        self.prefix = np.zeros((len(columns), len(keys) + 1), dtype=np.int32)
+        for row, value_of in enumerate(columns.values()):
+            self.prefix[row, 1:] = np.cumsum([value_of(entries[k]) for k in keys])
+
+    def window(self, window=None):
+        """Column totals for the last ``window`` puzzles up to the latest one (None = all-time)."""
+        lo = 0 if window is None else int(np.searchsorted(self.numbers, self.numbers[-1] - window + 1))
+        totals = self.prefix[:, -1] - self.prefix[:, lo]
+        return dict(zip(self.columns, totals.tolist()))
+
+
+AGGREGATE_CACHE_SIZE = 2048
+_cache = OrderedDict()  # (guild, user, game) -> PrefixAggregate, least recently used first
+
+
+def get_aggregate(data, guild_id, uid, game):
+    """Return the cached aggregate for ``uid``'s ``game`` results in a guild, building it if needed."""
+    entries = data["users"].get(uid, {}).get(game)
+    if not entries:
+        return None
+    key = (guild_id, uid, game)
+    if key not in _cache:
+        _cache[key] = PrefixAggregate(entries, GAME_COLUMNS[game])
+        while len(_cache) > AGGREGATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return _cache[key]
+
+
+def invalidate(guild_id, uid, game):
+    _cache.pop((guild_id, uid, game), None)
@@ -1,15 +1,19 @@
-import discord, os, json, dotenv, re, sys, pybound, io, calendar, string, random, time, asyncio, threading
-from discord.ui import View, Button
+import discord, os, json, dotenv, re, sys, pybound, io, string, random, time, asyncio, threading
 
 
 import matplotlib.pyplot as plt
+from tempfile import SpooledTemporaryFile
 from datetime import datetime, timedelta, timezone
 from PIL import Image, ImageDraw, ImageFont
 
 from io import BytesIO
 
-from flask import Flask, render_template, jsonify
-app = Flask(__name__)
+from aggregates import WINDOWS, DEFAULT_WINDOW, window_label, window_phrase, get_aggregate, invalidate
+from export import FORMATS, GAMES, stream_export
+from heatmap import render_calendar
+from store import load_data, save_data, load_channels, save_channels, channels_configured, seed_from_legacy
+from streaks import get_streaks, record as record_streaks, today_puzzle
+from views import Page, LazyPaginator
 
 
 # Emoji names and IDs (copy and paste for messaging and maybe reacting)
@@ -19,17 +23,20 @@ app = Flask(__name__)
 dotenv.load_dotenv()
 
 intents = discord.Intents.all()
-bot = discord.Bot(intents=intents)
+# AUTO_SHARD=1 splits the gateway connection across shards once the bot is in many guilds
+bot = discord.AutoShardedBot(intents=intents) if os.getenv("AUTO_SHARD") else discord.Bot(intents=intents)
 r_token = ""
 channel_processing = False
-DATA_FILE = "data.json"
 
-game_channel_ids = [814691396841766952, 1330386402432651355]  # Parrot Server, Dormin' Difference
+legacy_channel_ids = [814691396841766952, 1330386402432651355]  # Parrot Server, Dormin' Difference
+game_channels = load_channels()  # Channel ID -> guild ID, set with /channel add
 
 WORDLE_REGEX = r"Wordle (\d+) ([1-6X])/6"
 CONN_REGEX = r"Connections\nPuzzle #(\d+)\n([\s\S]+)"
 
-def generate_connections_mistake_chart(distribution, filepath):
+EMOJIS = {"wordle": "<:wordle:1393063212248858805>", "connections": "<:connections:1393063471616102461>"}
+
+def generate_connections_mistake_chart(distribution):
     guess_labels = ['0', '1', '2', '3', '4']  # Mistakes labels; 4 is loss
 
     # Reverse for horizontal bar order (top to bottom)
@@ -83,10 +90,12 @@ def generate_connections_mistake_chart(distribution, filepath):
         spine.set_visible(False)
 
     plt.tight_layout()
-    plt.savefig(filepath, dpi=300, bbox_inches='tight', transparent=False)
+    buffer = BytesIO()
+    plt.savefig(buffer, format="png", dpi=300, bbox_inches='tight', transparent=False)
     plt.close()
+    return buffer.getvalue()
 
-def generate_wordle_bar_chart(distribution, filepath):
+def generate_wordle_bar_chart(distribution):
     guess_labels = ['1', '2', '3', '4', '5', '6', 'X']
     if len(distribution) == 6:
         distribution.append(0)  # Add fails as "X"
@@ -142,28 +151,16 @@ def generate_wordle_bar_chart(distribution, filepath):
     ax.set_facecolor("white")        # white plot background
 
     plt.tight_layout()
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
+    buffer = BytesIO()
+    plt.savefig(buffer, format="png", dpi=300, bbox_inches='tight')
     plt.close()
+    return buffer.getvalue()
 
-def load_data():
-    try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            if "users" not in data:
-                data["users"] = {}
-            return data
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"users": {}}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-async def regex_message(message):
+async def regex_message(message, guild_id):
     content = message.content.replace(",", "")
     uid = str(message.author.id)
     username = message.author.name
-    data = load_data()
+    data = load_data(guild_id)
 
     # Initialize user if needed
     data["users"].setdefault(uid, {
@@ -183,11 +180,13 @@ async def regex_message(message):
         guesses = 7.5 if result == "X" else int(result)
         failed = result == "X"
 
-        data["users"][uid]["wordle"][puzzle_key] = {
+        entry = data["users"][uid]["wordle"][puzzle_key] = {
             "guesses": guesses,
             "failed": failed
         }
-        save_data(data)
+        save_data(guild_id, data)
+        invalidate(guild_id, uid, "wordle")
+        record_streaks(guild_id, uid, "wordle", puzzle, entry)
         await message.add_reaction("<:wordle:1393063212248858805>")
         [await message.add_reaction(e) for e in {1: ("1️⃣", "🤩"), 2: ("2️⃣", "😎"), 3: ("3️⃣", "😃"), 4: ("4️⃣", "🙂"), 5: ("5️⃣", "😬"), 6: ("6️⃣", "😅"), 7.5: ("❌", "😔")}[guesses]]
         return
@@ -239,12 +238,14 @@ async def regex_message(message):
 
         score = base + bonus
 
-        data["users"][uid]["connections"][puzzle_key] = {
+        entry = data["users"][uid]["connections"][puzzle_key] = {
             "mistakes": mistakes,
             "score": score,
             "purple_first": purple_first
         }
-        save_data(data)
+        save_data(guild_id, data)
+        invalidate(guild_id, uid, "connections")
+        record_streaks(guild_id, uid, "connections", puzzle, entry)
 
         await message.add_reaction("<:connections:1393063471616102461>")
         await message.add_reaction({5: "<:fifty:1393060774087360552>", 6: "<:sixty:1393039767746117652>", 7: "<:seventy:1393061147363508254>", 8: "<:eighty:1393042634104111124>", 9: "<:ninety:1393042776114855966>"}[score // 10])
@@ -255,9 +256,10 @@ async def regex_message(message):
 
 @bot.event
 async def on_message(message):
-    if message.author.bot or message.channel.id not in game_channel_ids:
+    guild_id = game_channels.get(message.channel.id)
+    if message.author.bot or guild_id is None:
         return
-    await regex_message(message)
+    await regex_message(message, guild_id)
 
 @bot.event
 async def on_ready():
@@ -267,10 +269,23 @@ async def on_ready():
     chars = string.ascii_letters + string.digits  # A-Z, a-z, 0-9
     r_token = ''.join(random.choice(chars) for _ in range(10))
     print(f"Security Token: {r_token}")
+
+    # One-time migration: until a channel index exists, register the original channels
+    # and split the old shared data file between their guilds. Later /channel remove calls stick.
+    if not channels_configured():
+        guild_members = {}
+        for channel_id in legacy_channel_ids:
+            channel = bot.get_channel(channel_id)
+            if channel is not None:
+                guild_members[channel.guild.id] = {str(member.id) for member in channel.guild.members}
+                game_channels[channel_id] = channel.guild.id
+        seed_from_legacy(guild_members)
+        save_channels(game_channels)
+
     user = await bot.fetch_user(715963994124451961)
     await user.send(f"Your security token: ||{r_token}||")
 
-readGroup = bot.create_group(name="read", description="read")
+readGroup = bot.create_group(name="read", description="read", contexts={discord.InteractionContextType.guild})
 channelGroup = readGroup.create_subgroup(name="channel", description="channel")
 
 @channelGroup.command(name="history", description="Read channel history using the security token.")
@@ -325,7 +340,7 @@ async def read_channel_history(ctx, token, from_message=None):
 
 
     async for message in game_channel.history(limit=None, oldest_first=True, after=after_msg):
-        await regex_message(message)
+        await regex_message(message, ctx.guild.id)
         processed += 1
 
         if processed % 10 == 0 or processed == total_msgs:
@@ -360,489 +375,364 @@ async def read_channel_history(ctx, token, from_message=None):
     await progress_msg.delete()
     await ctx.respond(f"✅ Channel history read complete.\n**Messages processed:** {processed}\n**Time elapsed:** {time_elapsed}", ephemeral=True)
     
+# ----------- /channel add, /channel remove, /channel list -------------
+channelConfigGroup = bot.create_group(
+    name="channel",
+    description="Choose which channels the bot reads results from",
+    contexts={discord.InteractionContextType.guild},
+    default_member_permissions=discord.Permissions(manage_channels=True)
+)
+
+@channelConfigGroup.command(name="add", description="Read game results posted in a channel.")
+@discord.option("channel", discord.TextChannel, description="Channel to add (defaults to this one)", required=False)
+async def channel_add(ctx, channel=None):
+    channel = channel or ctx.channel
+    game_channels[channel.id] = ctx.guild.id
+    save_channels(game_channels)
+    await ctx.respond(f"Now reading results from {channel.mention}.", ephemeral=True)
+
+@channelConfigGroup.command(name="remove", description="Stop reading game results from a channel.")
+@discord.option("channel", discord.TextChannel, description="Channel to remove (defaults to this one)", required=False)
+async def channel_remove(ctx, channel=None):
+    channel = channel or ctx.channel
+    if game_channels.get(channel.id) != ctx.guild.id:
+        await ctx.respond(f"{channel.mention} isn't a game channel.", ephemeral=True)
+        return
+    del game_channels[channel.id]
+    save_channels(game_channels)
+    await ctx.respond(f"No longer reading results from {channel.mention}.", ephemeral=True)
+
+@channelConfigGroup.command(name="list", description="List the channels game results are read from.")
+async def channel_list(ctx):
+    channels = [f"<#{channel_id}>" for channel_id, guild_id in game_channels.items() if guild_id == ctx.guild.id]
+    await ctx.respond("\n".join(channels) or "No game channels set. Use `/channel add`.", ephemeral=True)
+
+# ----------- /export -------------
+def write_export(shards, fmt, **filters):
+    # Spills to disk past 8 MB so large exports don't sit in memory
+    out = SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode="w+b")
+    for chunk in stream_export(shards, fmt, **filters):
+        out.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    out.seek(0)
+    return out
+
+@bot.slash_command(name="export", description="Export this server's results as CSV or Parquet.", contexts={discord.InteractionContextType.guild})
+@discord.default_permissions(administrator=True)
+@discord.option("format", description="File format", choices=list(FORMATS), required=False)
+@discord.option("game", description="Only export this game", choices=GAMES, required=False)
+@discord.option("user", description="Only export this user", required=False)
+@discord.option("start", description="First puzzle number to include", required=False)
+@discord.option("end", description="Last puzzle number to include", required=False)
+async def export(ctx, format: str = "csv", game: str = None, user: discord.User = None, start: int = None, end: int = None):
+    await ctx.defer(ephemeral=True)
+    shards = [(ctx.guild.id, load_data(ctx.guild.id))]
+
+    try:
+        out = await asyncio.to_thread(write_export, shards, format, game=game, user=user.id if user else None, start=start, end=end)
+    except RuntimeError as e:
+        await ctx.respond(str(e), ephemeral=True)
+        return
+
+    with out:
+        await ctx.respond(file=discord.File(out, filename=f"nyt_export.{format}"), ephemeral=True)
+
 # ----------- /wordle_stats -------------
-wordleGroup = bot.create_group(name="wordle", description="wordle")
+wordleGroup = bot.create_group(name="wordle", description="wordle", contexts={discord.InteractionContextType.guild})
 @wordleGroup.command(name="stats", description="View someone's Wordle stats.")
 @discord.option("user", description="User to view stats for", required=False)
-async def wordle_stats(ctx, user: discord.User = None):
+@discord.option("window", description="How many recent puzzles count as current", choices=list(WINDOWS), required=False)
+async def wordle_stats(ctx, user: discord.User = None, window: str = DEFAULT_WINDOW):
     await ctx.defer()
     user = user or ctx.author
-    data = load_data()
+    data = load_data(ctx.guild.id)
 
     uid = str(user.id)
     if uid not in data["users"] or "wordle" not in data["users"][uid]:
         await ctx.respond(f"No Wordle data found for {user.mention}.")
         return
 
-    entries = data["users"][uid]["wordle"]
-    total = len(entries)
-    wins = sum(1 for e in entries.values() if not e["failed"])
-    distribution = [0] * 6
-    fails = 0
-    guesses_list = []
-
-    # --- All-time stats ---
-    for e in entries.values():
-        if e["failed"]:
-            fails += 1
-        else:
-            g = e["guesses"]
-            distribution[g - 1] += 1
-            guesses_list.append(g)
-
-    avg_score = round(sum(guesses_list) / len(guesses_list), 2) if guesses_list else "N/A"
-    win_rate = round((wins / total) * 100, 2) if total else 0
-
-    # --- Determine latest Wordle number and 14-day window ---
-    wordle_numbers = sorted(int(k) for k in entries.keys())
-    latest_wordle = wordle_numbers[-1] if wordle_numbers else None
-    if latest_wordle is None:
+    agg = get_aggregate(data, ctx.guild.id, uid, "wordle")
+    if agg is None:
         await ctx.respond("No Wordle data available.")
         return
 
-    start_wordle_14day = max(latest_wordle - 13, wordle_numbers[0])  # inclusive
-
-    # --- 14-day stats ---
-    dist_14day = [0] * 6
-    fails_14day = 0
-    guesses_14day = []
-    total_14day = 0
-    wins_14day = 0
-
-    for wn in wordle_numbers:
-        if start_wordle_14day <= wn <= latest_wordle:
-            e = entries[str(wn)]
-            total_14day += 1
-            if e["failed"]:
-                fails_14day += 1
-            else:
-                wins_14day += 1
-                g = e["guesses"]
-                dist_14day[g - 1] += 1
-                guesses_14day.append(g)
-
-    avg_score_14day = round(sum(guesses_14day) / len(guesses_14day), 2) if guesses_14day else "N/A"
-    win_rate_14day = round((wins_14day / total_14day) * 100, 2) if total_14day else 0
-
-    # --- Streak Calculations ---
-    max_streak = 0
-    current_streak = 0
-    temp_streak = 0
-    last_seen = None
-
-    sorted_entries = sorted(((int(k), v) for k, v in entries.items()))
-
-    for num, entry in sorted_entries:
-        if last_seen is None or last_seen + 1 == num:
-            if not entry["failed"]:
-                temp_streak += 1
-                if current_streak == 0:
-                    current_streak = temp_streak
-            else:
-                if current_streak == 0:
-                    current_streak = 0
-                temp_streak = 0
-        else:
-            if current_streak == 0:
-                current_streak = 0
-            temp_streak = 1 if not entry["failed"] else 0
-        max_streak = max(max_streak, temp_streak)
-        last_seen = num
-
-    # --- Charts ---
-    generate_wordle_bar_chart(distribution + [fails], filepath="assets/wordle_bar_chart_alltime.png")
-    generate_wordle_bar_chart(dist_14day + [fails_14day], filepath="assets/wordle_bar_chart_14day.png")
-
-    # --- Embeds ---
-    embed_alltime = discord.Embed(
-        title=f"<:wordle:1393063212248858805> All-Time Wordle Stats for {user.name}",
-        color=discord.Color.green()
-    )
-    embed_alltime.add_field(name="Games Played", value=str(total))
-    embed_alltime.add_field(name="Win Rate", value=f"{win_rate}%")
-    embed_alltime.add_field(name="Average Guesses", value=str(avg_score))
-    embed_alltime.set_footer(text=f"Best Streak: {max_streak}🔥")
-    embed_alltime.add_field(name="Attempts", value="")
-    embed_alltime.set_image(url="attachment://wordle_bar_chart_alltime.png")
-
-    embed_14day = discord.Embed(
-        title=f"<:wordle:1393063212248858805> Current Wordle Stats for {user.name}",
-        color=discord.Color.green()
-    )
-    embed_14day.add_field(name="Games Played", value=str(total_14day))
-    embed_14day.add_field(name="Win Rate", value=f"{win_rate_14day}%")
-    embed_14day.add_field(name="Average Guesses", value=str(avg_score_14day))
-    embed_14day.set_footer(text=f"Current Streak: {current_streak}🔥")
-    embed_14day.add_field(name="Attempts", value="")
-    embed_14day.set_image(url="attachment://wordle_bar_chart_14day.png")
-
-    pages = [
-        {"embed": embed_alltime, "filepath": "assets/wordle_bar_chart_alltime.png"},
-        {"embed": embed_14day, "filepath": "assets/wordle_bar_chart_14day.png"},
-    ]
-
-    view = View(timeout=120)
-    view.current_page = 1
-
-    toggle_button = Button(label="See All-Time Stats", style=discord.ButtonStyle.secondary)
-    view.add_item(toggle_button)
-
-    async def toggle_callback(interaction: discord.Interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
-
-        view.current_page = 0 if view.current_page == 1 else 1
-        new_page = view.current_page
-        toggle_button.label = "See All-Time Stats" if new_page == 1 else "See Current Stats"
-
-        with open(pages[new_page]["filepath"], "rb") as f:
-            chart_file = discord.File(f, filename=pages[new_page]["filepath"].split("/")[-1])
-            await interaction.response.edit_message(embed=pages[new_page]["embed"], view=view, file=chart_file)
-
-    toggle_button.callback = toggle_callback    
+    # --- All-time stats ---
+    alltime = agg.window(None)
+    total = alltime["played"]
+    distribution = [alltime[f"g{i}"] for i in range(1, 7)]
+    fails = alltime["fails"]
+    avg_score = round(alltime["guesses"] / alltime["wins"], 2) if alltime["wins"] else "N/A"
+    win_rate = round((alltime["wins"] / total) * 100, 2) if total else 0
+
+    # --- Windowed stats ---
+    current = agg.window(WINDOWS[window])
+    total_window = current["played"]
+    dist_window = [current[f"g{i}"] for i in range(1, 7)]
+    fails_window = current["fails"]
+    avg_score_window = round(current["guesses"] / current["wins"], 2) if current["wins"] else "N/A"
+    win_rate_window = round((current["wins"] / total_window) * 100, 2) if total_window else 0
+
+    # --- Streaks ---
+    streaks = get_streaks(data, ctx.guild.id, uid, "wordle")
+    max_streak = streaks["win"].best
+    current_streak = streaks["win"].current(today_puzzle("wordle"))
+
+    # --- Pages (built when first shown) ---
+    def build_page(index):
+        if index == 0:
+            embed = discord.Embed(
+                title=f"<:wordle:1393063212248858805> {window_label(window)} Wordle Stats for {user.name}",
+                color=discord.Color.green()
+            )
+            embed.add_field(name="Games Played", value=str(total_window))
+            embed.add_field(name="Win Rate", value=f"{win_rate_window}%")
+            embed.add_field(name="Average Guesses", value=str(avg_score_window))
+            embed.set_footer(text=f"Current Streak: {current_streak}🔥")
+            embed.add_field(name="Attempts", value="")
+            embed.set_image(url="attachment://wordle_bar_chart_window.png")
+            return Page(embed, generate_wordle_bar_chart(dist_window + [fails_window]), "wordle_bar_chart_window.png")
 
-    chart_file_14day = discord.File("assets/wordle_bar_chart_14day.png", filename="wordle_bar_chart_14day.png")
-    await ctx.respond(embed=embed_14day, view=view, file=chart_file_14day)
+        embed = discord.Embed(
+            title=f"<:wordle:1393063212248858805> All-Time Wordle Stats for {user.name}",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Games Played", value=str(total))
+        embed.add_field(name="Win Rate", value=f"{win_rate}%")
+        embed.add_field(name="Average Guesses", value=str(avg_score))
+        embed.set_footer(text=f"Best Streak: {max_streak}🔥")
+        embed.add_field(name="Attempts", value="")
+        embed.set_image(url="attachment://wordle_bar_chart_alltime.png")
+        return Page(embed, generate_wordle_bar_chart(distribution + [fails]), "wordle_bar_chart_alltime.png")
+
+    if WINDOWS[window] is None:
+        # The windowed page would repeat the all-time one, so there's nothing to toggle
+        view = LazyPaginator(ctx.author, 1, lambda index: build_page(1))
+    else:
+        view = LazyPaginator(ctx.author, 2, build_page, toggle_labels=("See All-Time Stats", f"See {window_label(window)} Stats"))
+    await view.send(ctx)
 
 # ----------- /connections_stats -------------
-connectionsGroup = bot.create_group(name="connections", description="connections")
+connectionsGroup = bot.create_group(name="connections", description="connections", contexts={discord.InteractionContextType.guild})
 @connectionsGroup.command(name="stats", description="View someone's Connections stats.")
 @discord.option("user", description="User to view stats for", required=False)
-async def connections_stats(ctx, user: discord.User = None):
+@discord.option("window", description="How many recent puzzles count as current", choices=list(WINDOWS), required=False)
+async def connections_stats(ctx, user: discord.User = None, window: str = DEFAULT_WINDOW):
     await ctx.defer()
     user = user or ctx.author
-    data = load_data()
+    data = load_data(ctx.guild.id)
 
     uid = str(user.id)
     if uid not in data["users"] or "connections" not in data["users"][uid]:
         await ctx.respond(f"No Connections data found for {user.mention}.")
         return
 
-    entries = data["users"][uid]["connections"]
-    total = len(entries)
-    scores = [e["score"] for e in entries.values()]
-    avg_score = round(sum(scores) / len(scores), 2) if scores else "N/A"
-    perfects = sum(1 for e in entries.values() if e["score"] >= 95)
-    wins = sum(1 for e in entries.values() if e["mistakes"] <= 3)
-
-    # Mistake distribution 0-4 (4 = loss)
-    mistakes_list = [e["mistakes"] for e in entries.values()]
-    mistake_distribution = [mistakes_list.count(i) for i in range(5)]
-
-    # Calculate latest puzzle and 14-day rolling window
-    puzzle_keys = sorted(int(k) for k in entries.keys())
-    latest_puzzle = puzzle_keys[-1] if puzzle_keys else None
-    if latest_puzzle is None:
+    agg = get_aggregate(data, ctx.guild.id, uid, "connections")
+    if agg is None:
         await ctx.respond("No Connections data available.")
         return
 
-    start_puzzle_14day = max(latest_puzzle - 13, puzzle_keys[0])  # inclusive
-
-    # 14-day rolling stats
-    scores_14day = []
-    perfects_14day = 0
-    mistakes_14day = []
-    total_14day = 0
-    wins_14day = 0
-    purple_first_14day = 0
-    reverse_rainbow_14day = 0
-
-    for pk in puzzle_keys:
-        if start_puzzle_14day <= pk <= latest_puzzle:
-            e = entries[str(pk)]
-            total_14day += 1
-            scores_14day.append(e["score"])
-            if e["score"] >= 95:
-                perfects_14day += 1
-                if e["score"] == 99:
-                    reverse_rainbow_14day += 1
-            if e["mistakes"] <= 3:
-                wins_14day += 1
-            if e["purple_first"]:
-                purple_first_14day += 1
-            mistakes_14day.append(e["mistakes"])
-
-    avg_score_14day = round(sum(scores_14day) / len(scores_14day), 2) if scores_14day else "N/A"
-    mistake_distribution_14day = [mistakes_14day.count(i) for i in range(5)]
-
-    # Calculate streaks (perfect and regular)
-    sorted_entries = sorted(((int(k), v) for k, v in entries.items()))
-    print(sorted_entries)
-
-    max_streak = 0
-    current_streak = 0
-    perfect_streak = 0
-    current_perfect_streak = 0
-    last_seen = None
-
-    for num, entry in sorted_entries:
-        if last_seen is None or last_seen - 1 == num:
-            if entry["score"] >= 95:
-                current_perfect_streak += 1
-                current_streak += 1
-            else:
-                current_perfect_streak = 0
-                if entry["mistakes"] <= 3:  # consider any non-loss as part of streak
-                    current_streak += 1
-                else:
-                    current_streak = 0
-        else:
-            current_streak = 1 if entry["mistakes"] <= 3 else 0
-            current_perfect_streak = 1 if entry["score"] >= 95 else 0
-
-        max_streak = max(max_streak, current_streak)
-        perfect_streak = max(perfect_streak, current_perfect_streak)
-        last_seen = num
-
-    # Generate charts
-    generate_connections_mistake_chart(mistake_distribution_14day, "assets/connections_mistake_14day.png")
-    generate_connections_mistake_chart(mistake_distribution, "assets/connections_mistake_alltime.png")
-
-    # Embeds
-    embed_14day = discord.Embed(
-        title=f"<:connections:1393063471616102461> Current Connections Stats for {user.name}",
-        color=discord.Color.blurple()
-    )
-    embed_14day.add_field(name="Games Played", value=str(total_14day))
-    embed_14day.add_field(name="Win Rate", value=f"{round((wins_14day / total_14day) * 100, 2) if total_14day else 0}%")
-    embed_14day.add_field(name="Average Skill Score", value=str(avg_score_14day))
-    embed_14day.add_field(name="# Perfects", value=str(perfects_14day))
-    embed_14day.add_field(name="# Purple Firsts", value=str(purple_first_14day))
-    embed_14day.add_field(name="# Reverse Rainbows", value=str(reverse_rainbow_14day))
-    embed_14day.set_footer(text=f"Current Win Streak: {current_streak}🔥　　　　　　　　　　Current Perfect Streak: {current_perfect_streak}🔥")
-    embed_14day.add_field(name="Mistakes", value="")
-    embed_14day.set_image(url="attachment://connections_mistake_14day.png")
-
-    embed_alltime = discord.Embed(
-        title=f"<:connections:1393063471616102461> All-Time Connections Stats for {user.name}",
-        color=discord.Color.blurple()
-    )
-    embed_alltime.add_field(name="Games Played", value=str(total))
-    embed_alltime.add_field(name="Win Rate", value=f"{round((wins / total) * 100, 2) if total else 0}%")
-    embed_alltime.add_field(name="Average Skill Score", value=str(avg_score))
-    embed_alltime.add_field(name="# Perfects", value=str(perfects))
-    embed_alltime.add_field(name="# Purple Firsts", value=str(sum(1 for e in entries.values() if e.get("purple_first", False))))
-    embed_alltime.add_field(name="# Reverse Rainbows", value=str(sum(1 for e in entries.values() if e["score"] == 99)))
-    embed_alltime.set_footer(text=f"Best Win Streak: {max_streak}🔥　　　　　　　　　　　　　Best Perfect Streak: {perfect_streak}🔥")
-    embed_alltime.add_field(name="Mistakes", value="")
-    embed_alltime.set_image(url="attachment://connections_mistake_alltime.png")
-
-    pages = [
-        {"embed": embed_14day, "filepath": "assets/connections_mistake_14day.png"},
-        {"embed": embed_alltime, "filepath": "assets/connections_mistake_alltime.png"},
-    ]
+    # All-time stats; mistake distribution 0-4 (4 = loss)
+    alltime = agg.window(None)
+    total = alltime["played"]
+    avg_score = round(alltime["score"] / total, 2) if total else "N/A"
+    perfects = alltime["perfects"]
+    wins = alltime["wins"]
+    mistake_distribution = [alltime[f"m{i}"] for i in range(5)]
+
+    # Windowed rolling stats
+    current = agg.window(WINDOWS[window])
+    total_window = current["played"]
+    avg_score_window = round(current["score"] / total_window, 2) if total_window else "N/A"
+    perfects_window = current["perfects"]
+    wins_window = current["wins"]
+    purple_first_window = current["purple_first"]
+    reverse_rainbow_window = current["reverse_rainbows"]
+    mistake_distribution_window = [current[f"m{i}"] for i in range(5)]
+
+    # Streaks (perfect and regular)
+    streaks = get_streaks(data, ctx.guild.id, uid, "connections")
+    today = today_puzzle("connections")
+    max_streak = streaks["win"].best
+    current_streak = streaks["win"].current(today)
+    perfect_streak = streaks["perfect"].best
+    current_perfect_streak = streaks["perfect"].current(today)
+
+    # Pages (built when first shown)
+    def build_page(index):
+        if index == 0:
+            embed = discord.Embed(
+                title=f"<:connections:1393063471616102461> {window_label(window)} Connections Stats for {user.name}",
+                color=discord.Color.blurple()
+            )
+            embed.add_field(name="Games Played", value=str(total_window))
+            embed.add_field(name="Win Rate", value=f"{round((wins_window / total_window) * 100, 2) if total_window else 0}%")
+            embed.add_field(name="Average Skill Score", value=str(avg_score_window))
+            embed.add_field(name="# Perfects", value=str(perfects_window))
+            embed.add_field(name="# Purple Firsts", value=str(purple_first_window))
+            embed.add_field(name="# Reverse Rainbows", value=str(reverse_rainbow_window))
+            embed.set_footer(text=f"Current Win Streak: {current_streak}🔥　　　　　　　　　　Current Perfect Streak: {current_perfect_streak}🔥")
+            embed.add_field(name="Mistakes", value="")
+            embed.set_image(url="attachment://connections_mistake_window.png")
+            return Page(embed, generate_connections_mistake_chart(mistake_distribution_window), "connections_mistake_window.png")
 
-    view = View(timeout=120)
-    view.current_page = 0
-
-    toggle_button = Button(label="See All-Time Stats", style=discord.ButtonStyle.secondary)
-    view.add_item(toggle_button)
+        embed = discord.Embed(
+            title=f"<:connections:1393063471616102461> All-Time Connections Stats for {user.name}",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="Games Played", value=str(total))
+        embed.add_field(name="Win Rate", value=f"{round((wins / total) * 100, 2) if total else 0}%")
+        embed.add_field(name="Average Skill Score", value=str(avg_score))
+        embed.add_field(name="# Perfects", value=str(perfects))
+        embed.add_field(name="# Purple Firsts", value=str(alltime["purple_first"]))
+        embed.add_field(name="# Reverse Rainbows", value=str(alltime["reverse_rainbows"]))
+        embed.set_footer(text=f"Best Win Streak: {max_streak}🔥　　　　　　　　　　　　　Best Perfect Streak: {perfect_streak}🔥")
+        embed.add_field(name="Mistakes", value="")
+        embed.set_image(url="attachment://connections_mistake_alltime.png")
+        return Page(embed, generate_connections_mistake_chart(mistake_distribution), "connections_mistake_alltime.png")
+
+    if WINDOWS[window] is None:
+        # The windowed page would repeat the all-time one, so there's nothing to toggle
+        view = LazyPaginator(ctx.author, 1, lambda index: build_page(1))
+    else:
+        view = LazyPaginator(ctx.author, 2, build_page, toggle_labels=("See All-Time Stats", f"See {window_label(window)} Stats"))
+    await view.send(ctx)
 
-    async def toggle_callback(interaction: discord.Interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
+# ----------- /wordle_calendar, /connections_calendar -------------
+async def send_calendar(ctx, game, user, year):
+    await ctx.defer()
+    user = user or ctx.author
+    year = year or datetime.now(timezone.utc).year
+    data = load_data(ctx.guild.id)
 
-        view.current_page = 1 if view.current_page == 0 else 0
-        new_page = view.current_page
-        toggle_button.label = "See Current Stats" if new_page == 1 else "See All-Time Stats"
+    name = game.capitalize()
+    entries = data["users"].get(str(user.id), {}).get(game)
+    if not entries:
+        await ctx.respond(f"No {name} data found for {user.mention}.")
+        return
 
-        with open(pages[new_page]["filepath"], "rb") as f:
-            chart_file = discord.File(f, filename=pages[new_page]["filepath"].split("/")[-1])
-            await interaction.response.edit_message(embed=pages[new_page]["embed"], view=view, file=chart_file)
+    image = render_calendar(game, entries, year)
+    embed = discord.Embed(
+        title=f"{EMOJIS[game]} {year} {name} Calendar for {user.name}",
+        color=discord.Color.green() if game == "wordle" else discord.Color.blurple()
+    )
+    embed.set_image(url=f"attachment://{game}_calendar.png")
+    await ctx.respond(embed=embed, file=discord.File(image, filename=f"{game}_calendar.png"))
 
-    toggle_button.callback = toggle_callback
+@wordleGroup.command(name="calendar", description="View someone's Wordle calendar.")
+@discord.option("user", description="User to view the calendar for", required=False)
+@discord.option("year", description="Year to show (defaults to this year)", min_value=2021, max_value=9999, required=False)
+async def wordle_calendar(ctx, user: discord.User = None, year: int = None):
+    await send_calendar(ctx, "wordle", user, year)
 
-    chart_file_14day = discord.File("assets/connections_mistake_14day.png", filename="connections_mistake_14day.png")
-    await ctx.respond(embed=embed_14day, view=view, file=chart_file_14day)
+@connectionsGroup.command(name="calendar", description="View someone's Connections calendar.")
+@discord.option("user", description="User to view the calendar for", required=False)
+@discord.option("year", description="Year to show (defaults to this year)", min_value=2021, max_value=9999, required=False)
+async def connections_calendar(ctx, user: discord.User = None, year: int = None):
+    await send_calendar(ctx, "connections", user, year)
 
 # ----------- /wordle_leaderboard -------------
 @wordleGroup.command(name="leaderboard", description="Wordle leaderboard")
-async def wordle_leaderboard(ctx):
+@discord.option("window", description="How many recent puzzles to rank on", choices=list(WINDOWS), required=False)
+async def wordle_leaderboard(ctx, window: str = DEFAULT_WINDOW):
     await ctx.defer()
-    data = load_data()
-
-    today = datetime.now(timezone.utc)
+    data = load_data(ctx.guild.id)
 
     scores = []
-    for _, user_data in data["users"].items():
-        if "wordle" not in user_data:
+    for uid, user_data in data["users"].items():
+        agg = get_aggregate(data, ctx.guild.id, uid, "wordle")
+        if agg is None:
             continue
 
-        entries = user_data["wordle"]
-        if not entries:
-            continue
-
-        # Get wordle numbers sorted
-        wordle_numbers = sorted(int(k) for k in entries.keys())
-        latest_wordle = wordle_numbers[-1]
-
-        start_wordle_14day = max(latest_wordle - 13, wordle_numbers[0])
-
-        total_guesses = 0
-        count = 0
-        for wn in wordle_numbers:
-            if start_wordle_14day <= wn <= latest_wordle:
-                e = entries[str(wn)]
-                if not e["failed"]:
-                    total_guesses += e["guesses"]
-                    count += 1
-
+        totals = agg.window(WINDOWS[window])
+        count = totals["wins"]
         if count > 0:
-            avg = total_guesses / count
+            avg = totals["guesses"] / count
             scores.append((user_data["username"], round(avg, 2), count))
 
     if not scores:
-        await ctx.respond("No Wordle entries found for the last 14 days.")
+        await ctx.respond(f"No Wordle entries found {window_phrase(window)}.")
         return
 
     # Sort ascending by avg guesses (lower is better)
     scores.sort(key=lambda x: x[1])
 
     PER_PAGE = 10
-    pages = []
-    for page_start in range(0, len(scores), PER_PAGE):
+
+    def build_page(index):
+        page_start = index * PER_PAGE
         chunk = scores[page_start:page_start+PER_PAGE]
         description = "\n".join(
             f"**{rank}. {u}** — {avg} avg over {n} games"
             for rank, (u, avg, n) in enumerate(chunk, start=page_start+1)
         )
         embed = discord.Embed(
-            title="🏆 Wordle Leaderboard",
+            title=f"🏆 Wordle Leaderboard ({window_label(window)})",
             description=description,
             color=discord.Color.green()
         )
-        pages.append(embed)
-
-
-
-    view = View(timeout=120)
-    view.current_page = 0
+        return Page(embed)
 
-    btn_prev = Button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
-    btn_next = Button(label="Next ➡️", style=discord.ButtonStyle.secondary)
-    view.add_item(btn_prev)
-    view.add_item(btn_next)
-
-    async def prev_callback(interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
-        view.current_page = (view.current_page - 1) % len(pages)
-        embed = pages[view.current_page]
-        await interaction.response.edit_message(embed=embed, view=view)
-
-    async def next_callback(interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
-        view.current_page = (view.current_page + 1) % len(pages)
-        embed = pages[view.current_page]
-        await interaction.response.edit_message(embed=embed, view=view)
-
-    btn_prev.callback = prev_callback
-    btn_next.callback = next_callback
-
-    await ctx.respond(embed=pages[0], view=view)
+    view = LazyPaginator(ctx.author, -(-len(scores) // PER_PAGE), build_page)
+    await view.send(ctx)
 
 
 # ----------- /connections_leaderboard -------------
 @connectionsGroup.command(name="leaderboard", description="Connections leaderboard")
-async def connections_leaderboard(ctx):
+@discord.option("window", description="How many recent puzzles to rank on", choices=list(WINDOWS), required=False)
+async def connections_leaderboard(ctx, window: str = DEFAULT_WINDOW):
     await ctx.defer()
-    data = load_data()
+    data = load_data(ctx.guild.id)
 
     scores = []
-    for _, user_data in data["users"].items():
-        if "connections" not in user_data:
+    for uid, user_data in data["users"].items():
+        agg = get_aggregate(data, ctx.guild.id, uid, "connections")
+        if agg is None:
             continue
 
-        entries = user_data["connections"]
-        if not entries:
-            continue
-
-        puzzle_keys = sorted(int(k) for k in entries.keys())
-        latest_puzzle = puzzle_keys[-1]
-
-        start_puzzle_14day = max(latest_puzzle - 13, puzzle_keys[0])
-
-        total_score = 0
-        count = 0
-        for pk in puzzle_keys:
-            if start_puzzle_14day <= pk <= latest_puzzle:
-                e = entries[str(pk)]
-                total_score += e["score"]
-                count += 1
-
+        totals = agg.window(WINDOWS[window])
+        count = totals["played"]
         if count > 0:
-            avg = total_score / count
+            avg = totals["score"] / count
             scores.append((user_data["username"], round(avg, 2), count))
 
     if not scores:
-        await ctx.respond("No Connections entries found for the last 14 days.")
+        await ctx.respond(f"No Connections entries found {window_phrase(window)}.")
         return
 
     # Sort descending by avg score (higher is better)
     scores.sort(key=lambda x: x[1], reverse=True)
 
     PER_PAGE = 10
-    pages = []
-    for page_start in range(0, len(scores), PER_PAGE):
+
+    def build_page(index):
+        page_start = index * PER_PAGE
         chunk = scores[page_start:page_start+PER_PAGE]
         description = "\n".join(
             f"**{rank}. {u}** — {avg} avg over {n} games"
             for rank, (u, avg, n) in enumerate(chunk, start=page_start+1)
         )
         embed = discord.Embed(
-            title="🏆 Connections Leaderboard",
+            title=f"🏆 Connections Leaderboard ({window_label(window)})",
             description=description,
             color=discord.Color.blurple()
         )
-        pages.append(embed)
-
-
-    view = View(timeout=120)
-    view.current_page = 0
-
-    btn_prev = Button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
-    btn_next = Button(label="Next ➡️", style=discord.ButtonStyle.secondary)
-    view.add_item(btn_prev)
-    view.add_item(btn_next)
-
-    async def prev_callback(interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
-        view.current_page = (view.current_page - 1) % len(pages)
-        embed = pages[view.current_page]
-        await interaction.response.edit_message(embed=embed, view=view)
-
-    async def next_callback(interaction):
-        if interaction.user != ctx.author:
-            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
-            return
-        view.current_page = (view.current_page + 1) % len(pages)
-        
-        embed = pages[view.current_page]
-        await interaction.response.edit_message(embed=embed, view=view)
-
-    btn_prev.callback = prev_callback
-    btn_next.callback = next_callback
+        return Page(embed)
 
-    await ctx.respond(embed=pages[0], view=view)
+    view = LazyPaginator(ctx.author, -(-len(scores) // PER_PAGE), build_page)
+    await view.send(ctx)
 
 
 # Run the bot
-@app.route("/")
-def index():
-    with open("data.json", "r") as f:
-        raw_json = f.read()
-    return render_template("index.html", raw_json=raw_json)
-
-threading.Thread(target=lambda: bot.run(os.getenv("TOKEN"))).start()
-
-
+# `python app.py bot` runs only the bot (the single writer) and pairs with `gunicorn web:app`.
+# `python app.py` (or `all`) keeps the single-process setup: bot in a thread next to the Flask dev server.
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=False)
+    role = sys.argv[1] if len(sys.argv) > 1 else "all"
+    if role not in ("bot", "all"):
+        sys.exit("usage: python app.py [bot|all]  (serve the web role with gunicorn web:app)")
+    if role == "bot":
+        bot.run(os.getenv("TOKEN"))
+    else:
+        from web import app
+        threading.Thread(target=lambda: bot.run(os.getenv("TOKEN"))).start()
+        port = int(os.environ.get("PORT", 5000))
+        app.run(host="0.0.0.0", port=port, debug=False)
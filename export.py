@@ -0,0 +1,114 @@
+import csv
+from io import StringIO
+from itertools import islice
+
+COLUMNS = ["guild_id", "user_id", "username", "game", "puzzle", "guesses", "failed", "mistakes", "score", "purple_first"]
+GAMES = ["wordle", "connections", "mini"]
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+CHUNK_ROWS = 5000  # Rows buffered per CSV chunk / Parquet row group
+
+
+def iter_rows(shards, game=None, user=None, start=None, end=None):
+    """Yield one tuple per result, in COLUMNS order, filtered by game, user ID and puzzle range.
+
+    ``shards`` yields (guild_id, data) pairs; pass a generator so only one guild is loaded at a time.
+    """
+    for guild_id, data in shards:
+        for uid, user_data in data["users"].items():
+            if user is not None and uid != str(user):
+                continue
+            for game_name in GAMES:
+                if game is not None and game_name != game:
+                    continue
+                for key, entry in user_data.get(game_name, {}).items():
+                    puzzle = int(key)
+                    if (start is not None and puzzle < start) or (end is not None and puzzle > end):
+                        continue
+                    yield (str(guild_id), uid, user_data["username"], game_name, puzzle) + tuple(entry.get(col) for col in COLUMNS[5:])
+
+
+def iter_chunks(rows, size=CHUNK_ROWS):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def stream_csv(rows):
+    """Yield the CSV text in chunks, header first."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in iter_chunks(rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _Drain:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+def stream_parquet(rows):
+    """Yield a Parquet file in pieces, writing one row group per chunk of rows."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+
+    schema = pa.schema([
+        ("guild_id", pa.string()),
+        ("user_id", pa.string()),
+        ("username", pa.string()),
+        ("game", pa.string()),
+        ("puzzle", pa.int64()),
+        ("guesses", pa.float64()),
+        ("failed", pa.bool_()),
+        ("mistakes", pa.int64()),
+        ("score", pa.int64()),
+        ("purple_first", pa.bool_()),
+    ])
+
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in iter_chunks(rows):
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(shards, fmt="csv", **filters):
+    rows = iter_rows(shards, **filters)
+    return stream_parquet(rows) if fmt == "parquet" else stream_csv(rows)
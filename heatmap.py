@@ -0,0 +1,118 @@
+import calendar
+from datetime import date
+from functools import lru_cache
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from puzzles import puzzle_number
+
+CELL = 16           # Cell size in pixels
+GAP = 3             # Gap between cells
+TITLE = 18          # Height reserved for the month name
+SPACING = 16        # Space between month grids
+MARGIN = 12         # Outer margin of the year image
+MONTHS_PER_ROW = 4
+
+MONTH_W = 7 * (CELL + GAP) - GAP
+MONTH_H = TITLE + 6 * (CELL + GAP) - GAP
+
+BACKGROUND = (255, 255, 255)
+EMPTY = (235, 237, 240)  # Day with no result
+
+# Palette index 0 is "not played"; higher levels are better results
+PALETTES = {
+    "wordle": np.array([
+        EMPTY,
+        (120, 124, 126),  # X
+        (201, 230, 191),  # 6
+        (156, 207, 139),  # 5
+        (106, 170, 100),  # 4
+        (74, 140, 68),    # 3
+        (40, 100, 36),    # 1-2
+    ], dtype=np.uint8),
+    "connections": np.array([
+        EMPTY,
+        (120, 124, 126),  # Loss
+        (249, 223, 109),  # 3 mistakes
+        (160, 195, 90),   # 2 mistakes
+        (176, 196, 239),  # 1 mistake
+        (186, 129, 197),  # Perfect
+        (114, 56, 140),   # Reverse rainbow
+    ], dtype=np.uint8),
+}
+
+LEVELS = {
+    "wordle": lambda e: 1 if e["failed"] else 8 - max(int(e["guesses"]), 2),
+    "connections": lambda e: 6 if e["score"] == 99 else 5 - e["mistakes"],
+}
+
+_calendar = calendar.Calendar(firstweekday=6)  # Weeks start on Sunday
+
+
+@lru_cache(maxsize=64)
+def month_base(year, month):
+    """Empty grid image for one month plus a map of which day each pixel belongs to (0 = none)."""
+    img = Image.new("RGB", (MONTH_W, MONTH_H), BACKGROUND)
+    draw = ImageDraw.Draw(img)
+    draw.text((0, 2), calendar.month_abbr[month], fill=(0, 0, 0), font=ImageFont.load_default())
+
+    days = np.zeros((MONTH_H, MONTH_W), dtype=np.int16)
+    for row, week in enumerate(_calendar.monthdayscalendar(year, month)):
+        for col, day in enumerate(week):
+            if not day:
+                continue
+            x = col * (CELL + GAP)
+            y = TITLE + row * (CELL + GAP)
+            draw.rectangle([x, y, x + CELL - 1, y + CELL - 1], fill=EMPTY)
+            days[y:y + CELL, x:x + CELL] = day
+
+    pixels = np.asarray(img)
+    pixels.setflags(write=False)
+    days.setflags(write=False)
+    return pixels, days
+
+
+@lru_cache(maxsize=8)
+def year_base(year):
+    """Twelve month grids laid out in one image; the map holds the day of the year (1-366)."""
+    rows = -(-12 // MONTHS_PER_ROW)
+    width = 2 * MARGIN + MONTHS_PER_ROW * MONTH_W + (MONTHS_PER_ROW - 1) * SPACING
+    height = 2 * MARGIN + rows * MONTH_H + (rows - 1) * SPACING
+
+    pixels = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    days = np.zeros((height, width), dtype=np.int16)
+    for month in range(1, 13):
+        month_pixels, month_days = month_base(year, month)
+        x = MARGIN + ((month - 1) % MONTHS_PER_ROW) * (MONTH_W + SPACING)
+        y = MARGIN + ((month - 1) // MONTHS_PER_ROW) * (MONTH_H + SPACING)
+        offset = date(year, month, 1).timetuple().tm_yday - 1
+
+        pixels[y:y + MONTH_H, x:x + MONTH_W] = month_pixels
+        days[y:y + MONTH_H, x:x + MONTH_W] = np.where(month_days > 0, month_days + offset, 0)
+
+    pixels.setflags(write=False)
+    days.setflags(write=False)
+    return pixels, days
+
+
+def render_calendar(game, entries, year):
+    """Render a user's results for ``game`` in ``year`` and return the PNG as a BytesIO."""
+    pixels, days = year_base(year)
+    first = puzzle_number(game, date(year, 1, 1))
+    day_count = 366 if calendar.isleap(year) else 365
+
+    levels = np.zeros(day_count + 1, dtype=np.intp)
+    for key, entry in entries.items():
+        day = int(key) - first + 1
+        if 1 <= day <= day_count:
+            levels[day] = LEVELS[game](entry)
+
+    colors = PALETTES[game][levels][days]
+    image = np.where(days[..., None] > 0, colors, pixels)
+
+    buffer = BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG", compress_level=1)
+    buffer.seek(0)
+    return buffer
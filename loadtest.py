@@ -0,0 +1,72 @@
+"""Measure web throughput for different gunicorn worker counts.
+
+    python loadtest.py --workers 1 2 4 --clients 8 --duration 5
+"""
+import argparse, os, socket, subprocess, sys, time, urllib.request
+from multiprocessing import Pool
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def hammer(args):
+    url, duration = args
+    count = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        urllib.request.urlopen(url).read()
+        count += 1
+    return count
+
+
+def run(workers, clients, duration, path):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "web:app"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(url)
+        with Pool(clients) as pool:
+            total = sum(pool.map(hammer, [(url, duration)] * clients))
+    finally:
+        server.terminate()
+        server.wait()
+    return total / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    print(f"{cpus} CPU(s); worker counts above that can't add throughput")
+    baseline = None
+    for workers in args.workers:
+        rps = run(workers, args.clients, args.duration, args.path)
+        baseline = baseline or rps
+        print(f"{workers} worker(s): {rps:8.1f} req/s  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from datetime import date
+
+# Date of puzzle #0 for each game (Wordle #1 = 2021-06-20, Connections #1 = 2023-06-12)
+PUZZLE_EPOCHS = {
+    "wordle": date(2021, 6, 19),
+    "connections": date(2023, 6, 11),
+}
+
+
+def puzzle_number(game, day):
+    return (day - PUZZLE_EPOCHS[game]).days
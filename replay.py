@@ -0,0 +1,250 @@
+"""Replay a stream of shares, chatter and slash commands through the bot's handlers offline.
+
+    python replay.py --events 500 --rate 50
+    python replay.py --input recorded.jsonl --rate 20
+    python replay.py --events 500 --rate 0     # unthrottled, for maximum throughput
+
+Recorded streams are JSON lines, one event per line:
+    {"type": "message", "author_id": 1, "author": "name", "content": "Wordle 1,500 3/6 ..."}
+    {"type": "command", "name": "wordle stats", "author_id": 1, "author": "name", "options": {"window": "7"}}
+"""
+import argparse, asyncio, inspect, json, os, random, shutil, sys, tempfile, time
+from itertools import count
+
+# Point the store at a scratch directory before the bot module reads DATA_DIR
+_scratch = tempfile.mkdtemp(prefix="nyt-replay-")
+os.environ["DATA_DIR"] = _scratch
+
+import app  # noqa: E402
+from store import shard_path  # noqa: E402
+from views import LazyPaginator  # noqa: E402
+
+GUILD_ID = 1
+CHANNEL_ID = 2
+
+COMMANDS = {
+    "wordle stats": app.wordle_stats,
+    "wordle leaderboard": app.wordle_leaderboard,
+    "wordle calendar": app.wordle_calendar,
+    "connections stats": app.connections_stats,
+    "connections leaderboard": app.connections_leaderboard,
+    "connections calendar": app.connections_calendar,
+    "read channel history": app.read_channel_history,
+}
+
+CHATTER = ["gm", "that was rough today", "lol", "who got it in 2??", "purple first or bust", "brb"]
+
+_message_ids = count(1)
+
+
+# ---- Stand-ins for the discord objects the handlers touch ----
+
+class FakeAuthor:
+    def __init__(self, id, name, bot=False):
+        self.id = id
+        self.name = name
+        self.bot = bot
+        self.mention = f"<@{id}>"
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMessage:
+    def __init__(self, content, author, channel):
+        self.id = next(_message_ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.reactions = []
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+    async def edit(self, content=None, **kwargs):
+        if content is not None:
+            self.content = content
+
+    async def delete(self):
+        pass
+
+
+class FakeGuild:
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeChannel:
+    def __init__(self, id, guild, messages=()):
+        self.id = id
+        self.guild = guild
+        self.messages = list(messages)
+
+    async def history(self, limit=None, oldest_first=False, after=None):
+        messages = self.messages if oldest_first else self.messages[::-1]
+        if after is not None:
+            messages = [m for m in messages if m.id > after.id]
+        for message in messages[:limit]:
+            yield message
+
+    async def fetch_message(self, id):
+        return next(m for m in self.messages if m.id == id)
+
+
+class FakeContext:
+    def __init__(self, author, channel):
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.responses = []
+
+    async def defer(self, ephemeral=False):
+        pass
+
+    async def respond(self, content=None, **kwargs):
+        message = FakeMessage(content or "", app.bot.user or self.author, self.channel)
+        # Files are read once so chart/export generation is timed end to end, then released
+        file = kwargs.get("file")
+        if file is not None:
+            file.fp.read()
+            file.close()
+        self.responses.append(message)
+        return message
+
+
+async def call_command(command, ctx, options):
+    """Invoke a slash command callback with its declared option defaults filled in."""
+    kwargs = {}
+    for name, param in list(inspect.signature(command.callback).parameters.items())[1:]:
+        default = param.default
+        kwargs[name] = getattr(default, "default", default)
+    kwargs.update(options)
+    await command.callback(ctx, **kwargs)
+
+
+# ---- Event streams ----
+
+def synthetic_events(n, users=30, seed=0):
+    rng = random.Random(seed)
+    players = [(1000 + i, f"player{i}") for i in range(users)]
+    wordle, connections = 1500, 780
+    for i in range(n):
+        uid, name = rng.choice(players)
+        day = i * 10 // n  # The stream spans ten puzzle days
+        roll = rng.random()
+        if roll < 0.4:
+            result = rng.choice("123456X")
+            content = f"Wordle {wordle + day:,} {result}/6\n\n⬛🟨⬛⬛⬛\n🟩🟩🟩🟩🟩"
+        elif roll < 0.75:
+            colors = ["🟨", "🟩", "🟦", "🟪"]
+            rng.shuffle(colors)
+            rows = [c * 4 for c in colors]
+            for _ in range(rng.randint(0, 4)):
+                rows.insert(rng.randrange(len(rows)), "".join(rng.sample(colors, 4)))
+            content = f"Connections\nPuzzle #{connections + day}\n" + "\n".join(rows)
+        elif roll < 0.95:
+            content = rng.choice(CHATTER)
+        else:
+            yield {"type": "command", "name": rng.choice(list(COMMANDS)[:6]), "author_id": uid, "author": name}
+            continue
+        yield {"type": "message", "author_id": uid, "author": name, "content": content}
+
+
+def recorded_events(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ---- Replay ----
+
+async def monitor_lag(samples, interval=0.01):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def dispatch(event, channel, latencies):
+    author = FakeAuthor(event["author_id"], event["author"])
+    start = time.perf_counter()
+    if event["type"] == "message":
+        message = FakeMessage(event["content"], author, channel)
+        channel.messages.append(message)
+        await app.on_message(message)
+        kind = "on_message"
+    else:
+        options = dict(event.get("options", {}))
+        if event["name"] == "read channel history":
+            options.setdefault("token", app.r_token)
+        await call_command(COMMANDS[event["name"]], FakeContext(author, channel), options)
+        kind = event["name"]
+    latencies.setdefault(kind, []).append(time.perf_counter() - start)
+
+
+async def replay(events, rate):
+    channel = FakeChannel(CHANNEL_ID, FakeGuild(GUILD_ID))
+    app.game_channels[CHANNEL_ID] = GUILD_ID
+    latencies, lag, tasks = {}, [], []
+    monitor = asyncio.create_task(monitor_lag(lag))
+
+    start = time.perf_counter()
+    for i, event in enumerate(events):
+        # rate <= 0 dispatches back to back, so throughput measures the handlers themselves
+        if rate > 0:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(dispatch(event, channel, latencies)))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    monitor.cancel()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    return len(tasks), elapsed, latencies, lag, errors
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def report(total, elapsed, latencies, lag, errors):
+    print(f"Events: {total} in {elapsed:.2f}s ({total / elapsed:.1f}/s), errors: {len(errors)}")
+    print(f"{'handler':<26}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, values in sorted(latencies.items()):
+        print(f"{kind:<26}{len(values):>7}{percentile(values, 50) * 1000:>10.1f}{percentile(values, 99) * 1000:>10.1f}")
+    print(f"Event loop lag: p50 {percentile(lag, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(lag, 99) * 1000:.1f} ms, max {max(lag, default=0) * 1000:.1f} ms")
+    usage = LazyPaginator.usage()
+    print(f"Open views: {usage['views']}, cached pages: {usage['pages']}, chart bytes held: {usage['chart_bytes']:,}")
+    for error in errors[:5]:
+        print(f"  {type(error).__name__}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", help="JSON lines file of recorded events (default: synthetic)")
+    parser.add_argument("--events", type=int, default=300, help="Number of synthetic events")
+    parser.add_argument("--rate", type=float, default=30, help="Events dispatched per second (0 = unthrottled)")
+    parser.add_argument("--seed-data", default="data.json", help="Guild data file to start from (copied, never modified)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.seed_data):
+        shutil.copy(args.seed_data, shard_path(GUILD_ID))
+    events = recorded_events(args.input) if args.input else synthetic_events(args.events)
+
+    try:
+        report(*asyncio.run(replay(events, args.rate)))
+    finally:
+        shutil.rmtree(_scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import codecs, json, mmap, os
+
+# The bot process is the only writer; web workers only ever read published snapshots.
+# Each guild's results live in their own shard, DATA_DIR/<guild_id>.json.
+DATA_DIR = os.getenv("DATA_DIR", "guilds")
+CHANNELS_FILE = os.path.join(DATA_DIR, "channels.json")
+
+# Pre-partitioning single-guild file, used to seed the shards of the guilds that shared it
+LEGACY_DATA_FILE = os.getenv("DATA_FILE", "data.json")
+
+SNAPSHOT_CHUNK = 64 * 1024  # Bytes of a shard copied out of its memory map at a time
+
+
+def shard_path(guild_id):
+    return os.path.join(DATA_DIR, f"{guild_id}.json")
+
+
+def guild_ids():
+    """IDs of every guild with a published shard."""
+    if not os.path.isdir(DATA_DIR):
+        return []
+    return sorted(
+        name[:-len(".json")] for name in os.listdir(DATA_DIR)
+        if name.endswith(".json") and name[:-len(".json")].isdigit()
+    )
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path, data):
+    # Write next to the live file and swap it in, so readers never see a half-written snapshot
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def load_data(guild_id):
+    data = _read_json(shard_path(guild_id), {"users": {}})
+    if "users" not in data:
+        data["users"] = {}
+    return data
+
+
+def save_data(guild_id, data):
+    _write_json(shard_path(guild_id), data)
+
+
+def seed_from_legacy(guild_members):
+    """Split the legacy data file into shards for the guilds that shared it.
+
+    ``guild_members`` maps guild ID -> set of member user IDs (as strings). Each user
+    goes to the guilds they're a member of; users who have left all of them are kept
+    in every guild, since the legacy file never recorded where a result came from.
+    Guilds that already have a shard are left alone.
+    """
+    legacy = _read_json(LEGACY_DATA_FILE, None)
+    if legacy is None:
+        return
+
+    users = legacy.get("users", {})
+    for guild_id, members in guild_members.items():
+        if os.path.exists(shard_path(guild_id)):
+            continue
+        shard_users = {
+            uid: user_data for uid, user_data in users.items()
+            if uid in members or not any(uid in others for others in guild_members.values())
+        }
+        save_data(guild_id, {**legacy, "users": shard_users})
+
+
+def channels_configured():
+    return os.path.exists(CHANNELS_FILE)
+
+
+def load_channels():
+    """Game channel index: channel ID -> guild ID."""
+    return {int(channel): guild for channel, guild in _read_json(CHANNELS_FILE, {}).items()}
+
+
+def save_channels(channels):
+    _write_json(CHANNELS_FILE, {str(channel): guild for channel, guild in channels.items()})
+
+
+def read_snapshot(guild_id):
+    """Yield a guild's latest published shard as text, chunk by chunk, through a memory map.
+
+    The shard's pages are shared with every other worker through the OS page cache,
+    and a worker only ever copies SNAPSHOT_CHUNK bytes of it. The map stays on the
+    file that was published when reading started, even if the bot replaces it meanwhile.
+    """
+    try:
+        f = open(shard_path(guild_id), "rb")
+    except FileNotFoundError:
+        yield json.dumps({"users": {}})
+        return
+
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for offset in range(0, len(m), SNAPSHOT_CHUNK):
+                yield decoder.decode(m[offset:offset + SNAPSHOT_CHUNK])
+            yield decoder.decode(b"", final=True)
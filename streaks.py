@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from puzzles import puzzle_number
+
+# Which results extend each kind of streak, per game
+STREAK_KINDS = {
+    "wordle": {
+        "win": lambda e: not e["failed"],
+    },
+    "connections": {
+        "win": lambda e: e["mistakes"] <= 3,
+        "perfect": lambda e: e["score"] >= 95,
+    },
+}
+
+
+class RunSet:
+    """Maximal runs of consecutive puzzle numbers whose results qualify (e.g. wins).
+
+    Runs are stored by their boundaries only, so recording a new puzzle, in any
+    order, joins at most two neighbouring runs in O(1). Overwriting a qualifying
+    result with a non-qualifying one splits its run, which walks that run once.
+    """
+
+    def __init__(self):
+        self.qualifies = {}  # Puzzle -> whether its result qualifies
+        self.start_of = {}   # Run end -> run start
+        self.end_of = {}     # Run start -> run end
+        self.latest = None
+        self.best = 0
+
+    def add(self, puzzle, ok):
+        previous = self.qualifies.get(puzzle)
+        self.qualifies[puzzle] = ok
+        if self.latest is None or puzzle > self.latest:
+            self.latest = puzzle
+
+        if previous == ok:
+            return
+        if ok:
+            self._join(puzzle)
+        elif previous:
+            self._split(puzzle)
+
+    def _join(self, puzzle):
+        start = end = puzzle
+        if puzzle - 1 in self.start_of:
+            start = self.start_of.pop(puzzle - 1)
+            del self.end_of[start]
+        if puzzle + 1 in self.end_of:
+            end = self.end_of.pop(puzzle + 1)
+            del self.start_of[end]
+        self.end_of[start] = end
+        self.start_of[end] = start
+        self.best = max(self.best, end - start + 1)
+
+    def _split(self, puzzle):
+        end = puzzle
+        while self.qualifies.get(end + 1):
+            end += 1
+        start = self.start_of.pop(end)
+        del self.end_of[start]
+
+        for lo, hi in ((start, puzzle - 1), (puzzle + 1, end)):
+            if lo <= hi:
+                self.end_of[lo] = hi
+                self.start_of[hi] = lo
+        if end - start + 1 == self.best:
+            self.best = max((hi - lo + 1 for lo, hi in self.end_of.items()), default=0)
+
+    def current(self, today=None):
+        """Length of the run ending at the latest result.
+
+        0 if the latest result doesn't qualify or, when today's puzzle number is
+        given, if the player has missed every puzzle since yesterday's.
+        """
+        if self.latest not in self.start_of:
+            return 0
+        if today is not None and self.latest < today - 1:
+            return 0
+        return self.latest - self.start_of[self.latest] + 1
+
+
+def build_streaks(entries, game):
+    runs = {kind: RunSet() for kind in STREAK_KINDS[game]}
+    for key, entry in entries.items():
+        for kind, qualifies in STREAK_KINDS[game].items():
+            runs[kind].add(int(key), qualifies(entry))
+    return runs
+
+
+def today_puzzle(game):
+    return puzzle_number(game, datetime.now(timezone.utc).date())
+
+
+STREAK_CACHE_SIZE = 2048
+_cache = OrderedDict()  # (guild, user, game) -> RunSets by kind, least recently used first
+
+
+def get_streaks(data, guild_id, uid, game):
+    """Return the cached RunSets (by streak kind) for ``uid``'s ``game`` results in a guild."""
+    entries = data["users"].get(uid, {}).get(game)
+    if not entries:
+        return None
+    key = (guild_id, uid, game)
+    if key not in _cache:
+        _cache[key] = build_streaks(entries, game)
+        while len(_cache) > STREAK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return _cache[key]
+
+
+def record(guild_id, uid, game, puzzle, entry):
+    """Apply a newly ingested result to the cached streaks, if they have been built."""
+    runs = _cache.get((guild_id, uid, game))
+    if runs is None:
+        return
+    for kind, qualifies in STREAK_KINDS[game].items():
+        runs[kind].add(puzzle, qualifies(entry))
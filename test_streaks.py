@@ -0,0 +1,147 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+import streaks
+from streaks import STREAK_KINDS, RunSet, build_streaks, get_streaks, record
+
+
+def brute_force(results, today=None):
+    """Reference (best, current) streaks from a full scan of puzzle -> qualifies."""
+    best = run = 0
+    previous = None
+    for puzzle in sorted(results):
+        if not results[puzzle]:
+            run = 0
+        elif previous is not None and puzzle == previous + 1 and results[previous]:
+            run += 1
+        else:
+            run = 1
+        best = max(best, run)
+        previous = puzzle
+
+    current = run if results else 0
+    if today is not None and results and max(results) < today - 1:
+        current = 0
+    return best, current
+
+
+def assert_matches(runs, results):
+    best, current = brute_force(results)
+    assert runs.best == best
+    assert runs.current() == current
+    latest = max(results) if results else 0
+    for today in (latest, latest + 1, latest + 2, latest + 10):
+        assert runs.current(today) == brute_force(results, today)[1]
+
+
+def random_wordle(rng):
+    failed = rng.random() < 0.25
+    return {"guesses": 7.5 if failed else rng.randint(1, 6), "failed": failed}
+
+
+def random_connections(rng):
+    mistakes = rng.randint(0, 4)
+    score = rng.choice([95, 97, 99]) if mistakes == 0 else rng.randint(50, 90)
+    return {"mistakes": mistakes, "score": score, "purple_first": rng.random() < 0.3}
+
+
+RANDOM_ENTRY = {"wordle": random_wordle, "connections": random_connections}
+
+
+@pytest.mark.parametrize("order", ["in_order", "out_of_order", "overwriting"])
+@pytest.mark.parametrize("seed", range(300))
+def test_runset_matches_brute_force(order, seed):
+    rng = random.Random(seed)
+    if order == "in_order":
+        puzzles = sorted(rng.sample(range(60), rng.randint(0, 40)))
+    elif order == "out_of_order":
+        puzzles = rng.sample(range(60), rng.randint(0, 40))
+    else:
+        puzzles = [rng.randint(0, 25) for _ in range(rng.randint(0, 60))]
+
+    runs = RunSet()
+    results = {}
+    for puzzle in puzzles:
+        ok = rng.random() < 0.75
+        runs.add(puzzle, ok)
+        results[puzzle] = ok
+        assert_matches(runs, results)
+
+
+def test_overwriting_a_win_splits_its_run():
+    runs = RunSet()
+    for puzzle in range(10):
+        runs.add(puzzle, True)
+    runs.add(4, False)
+    assert (runs.best, runs.current()) == (5, 5)
+    runs.add(7, False)
+    assert (runs.best, runs.current()) == (4, 2)
+    runs.add(4, True)
+    assert (runs.best, runs.current()) == (7, 2)
+
+
+@pytest.mark.parametrize("game", ["wordle", "connections"])
+@pytest.mark.parametrize("seed", range(50))
+def test_build_streaks_matches_brute_force(game, seed):
+    rng = random.Random(seed)
+    entries = {str(puzzle): RANDOM_ENTRY[game](rng) for puzzle in rng.sample(range(1000, 1060), 40)}
+
+    runs = build_streaks(entries, game)
+    assert set(runs) == set(STREAK_KINDS[game])
+    for kind, qualifies in STREAK_KINDS[game].items():
+        assert_matches(runs[kind], {int(k): qualifies(e) for k, e in entries.items()})
+
+
+@pytest.mark.parametrize("game", ["wordle", "connections"])
+@pytest.mark.parametrize("seed", range(50))
+def test_record_updates_cached_streaks(game, seed, monkeypatch):
+    monkeypatch.setattr(streaks, "_cache", OrderedDict())
+    rng = random.Random(seed)
+    user_entries = {str(puzzle): RANDOM_ENTRY[game](rng) for puzzle in rng.sample(range(1000, 1030), 10)}
+    data = {"users": {"1": {"username": "player", game: user_entries}}}
+    runs = get_streaks(data, 7, "1", game)
+
+    # Backfilled, new and re-posted results, applied the way regex_message does
+    for _ in range(40):
+        puzzle = rng.randint(990, 1040)
+        entry = user_entries[str(puzzle)] = RANDOM_ENTRY[game](rng)
+        record(7, "1", game, puzzle, entry)
+
+        assert get_streaks(data, 7, "1", game) is runs
+        for kind, qualifies in STREAK_KINDS[game].items():
+            assert_matches(runs[kind], {int(k): qualifies(e) for k, e in user_entries.items()})
+
+
+def test_connections_perfect_streak_is_separate_from_win_streak():
+    entries = {
+        "800": {"mistakes": 0, "score": 95, "purple_first": False},
+        "801": {"mistakes": 0, "score": 99, "purple_first": True},
+        "802": {"mistakes": 2, "score": 81, "purple_first": False},
+        "803": {"mistakes": 0, "score": 97, "purple_first": True},
+    }
+    runs = build_streaks(entries, "connections")
+    assert (runs["win"].best, runs["win"].current()) == (4, 4)
+    assert (runs["perfect"].best, runs["perfect"].current()) == (2, 1)
+
+
+def test_record_ignores_streaks_that_were_never_built(monkeypatch):
+    monkeypatch.setattr(streaks, "_cache", OrderedDict())
+    record(7, "1", "wordle", 1000, {"guesses": 3, "failed": False})
+    assert streaks._cache == {}
+
+
+def test_evicted_streaks_are_rebuilt_with_later_results(monkeypatch):
+    monkeypatch.setattr(streaks, "_cache", OrderedDict())
+    monkeypatch.setattr(streaks, "STREAK_CACHE_SIZE", 2)
+    data = {"users": {uid: {"username": uid, "wordle": {"1000": {"guesses": 3, "failed": False}}} for uid in "123"}}
+    for uid in "123":
+        get_streaks(data, 7, uid, "wordle")
+    assert list(streaks._cache) == [(7, "2", "wordle"), (7, "3", "wordle")]
+
+    # Results for the evicted user are skipped by record() but picked up on rebuild
+    entry = data["users"]["1"]["wordle"]["1001"] = {"guesses": 4, "failed": False}
+    record(7, "1", "wordle", 1001, entry)
+    assert get_streaks(data, 7, "1", "wordle")["win"].current() == 2
+    assert len(streaks._cache) == 2
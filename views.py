@@ -0,0 +1,115 @@
+import weakref
+from io import BytesIO
+
+import discord
+from discord.ui import View, Button
+
+
+class Page:
+    """One page of a paginated message: an embed plus an optional chart kept as PNG bytes."""
+
+    __slots__ = ("embed", "chart", "filename")
+
+    def __init__(self, embed, chart=None, filename=None):
+        self.embed = embed
+        self.chart = chart
+        self.filename = filename
+
+    def file(self):
+        return discord.File(BytesIO(self.chart), filename=self.filename) if self.chart else None
+
+    def size(self):
+        return len(self.chart) if self.chart else 0
+
+
+class LazyPaginator(View):
+    """Paginated message that builds pages on demand.
+
+    ``build_page(index)`` returns a Page. Only the current page and its neighbours
+    stay cached, and everything is released when the view times out.
+    Two-page views get a single toggle button labelled from ``toggle_labels``.
+    """
+
+    live = weakref.WeakSet()
+
+    def __init__(self, author, page_count, build_page, toggle_labels=None, timeout=120):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.page_count = page_count
+        self.build_page = build_page
+        self.toggle_labels = toggle_labels
+        self.current_page = 0
+        self._pages = {}
+
+        if toggle_labels and page_count == 2:
+            self.toggle_button = Button(label=toggle_labels[0], style=discord.ButtonStyle.secondary)
+            self.toggle_button.callback = self.toggle_callback
+            self.add_item(self.toggle_button)
+        elif page_count > 1:
+            btn_prev = Button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
+            btn_next = Button(label="Next ➡️", style=discord.ButtonStyle.secondary)
+            btn_prev.callback = self.prev_callback
+            btn_next.callback = self.next_callback
+            self.add_item(btn_prev)
+            self.add_item(btn_next)
+
+        LazyPaginator.live.add(self)
+
+    def page(self, index):
+        if index not in self._pages:
+            self._pages[index] = self.build_page(index)
+        keep = {(index + offset) % self.page_count for offset in (-1, 0, 1)}
+        for cached in list(self._pages):
+            if cached not in keep:
+                del self._pages[cached]
+        return self._pages[index]
+
+    async def send(self, ctx):
+        page = self.page(self.current_page)
+        kwargs = {"file": page.file()} if page.chart else {}
+        if self.page_count > 1:
+            kwargs["view"] = self
+        await ctx.respond(embed=page.embed, **kwargs)
+
+    async def show(self, interaction, index):
+        self.current_page = index % self.page_count
+        page = self.page(self.current_page)
+        if self.toggle_labels and self.page_count == 2:
+            self.toggle_button.label = self.toggle_labels[self.current_page]
+        kwargs = {"file": page.file()} if page.chart else {}
+        await interaction.response.edit_message(embed=page.embed, view=self, **kwargs)
+
+    async def interaction_check(self, interaction):
+        if interaction.user != self.author:
+            await interaction.response.send_message("You're not allowed to use this.", ephemeral=True)
+            return False
+        return True
+
+    async def toggle_callback(self, interaction):
+        await self.show(interaction, self.current_page + 1)
+
+    async def prev_callback(self, interaction):
+        await self.show(interaction, self.current_page - 1)
+
+    async def next_callback(self, interaction):
+        await self.show(interaction, self.current_page + 1)
+
+    async def on_timeout(self):
+        # Drop the page builder too, so its closure's stats can be collected
+        self._pages.clear()
+        self.build_page = None
+        self.clear_items()
+        self.stop()
+
+    def retained_bytes(self):
+        return sum(page.size() for page in self._pages.values())
+
+    @classmethod
+    def usage(cls):
+        """Open views, cached pages and chart bytes held across all live paginators."""
+        views = list(cls.live)
+        return {
+            "views": len(views),
+            "pages": sum(len(view._pages) for view in views),
+            "chart_bytes": sum(view.retained_bytes() for view in views),
+        }
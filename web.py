@@ -0,0 +1,49 @@
+import os
+
+from flask import Flask, Response, request, stream_template, stream_with_context
+
+from export import FORMATS, GAMES, stream_export
+from store import guild_ids, load_data, read_snapshot
+
+# Stateless web role: serve with e.g. `gunicorn -w 4 web:app`
+app = Flask(__name__)
+
+
+@app.route("/")
+def index():
+    # Streamed so only one chunk of one guild's JSON is in flight at a time
+    shards = ((guild_id, read_snapshot(guild_id)) for guild_id in guild_ids())
+    return Response(stream_template("index.html", shards=shards))
+
+
+@app.route("/export")
+def export():
+    fmt = request.args.get("format", "csv")
+    game = request.args.get("game")
+    if fmt not in FORMATS or (game is not None and game not in GAMES):
+        return "Unknown format or game.", 400
+    guild = request.args.get("guild")
+    if guild is not None and not guild.isdigit():
+        return "Unknown guild.", 400
+
+    guilds = [guild] if guild else guild_ids()
+    # Parsed straight from disk, one guild at a time
+    shards = ((guild_id, load_data(guild_id)) for guild_id in guilds)
+    chunks = stream_export(
+        shards,
+        fmt,
+        game=game,
+        user=request.args.get("user"),
+        start=request.args.get("start", type=int),
+        end=request.args.get("end", type=int)
+    )
+    return Response(
+        stream_with_context(chunks),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=nyt_export.{fmt}"}
+    )
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 5000))
+    app.run(host="0.0.0.0", port=port, debug=False)